@@ -3,17 +3,20 @@ OpenAI Structured Output Example 1: Using Strict JSON Mode
 This example uses OpenAI's native structured output feature with JSON schema.
 """
 
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from typing import TypedDict
+import orjson
+from _client import get_client
+from _cache import cached_complete
 
-# Load environment variables from .env file
-load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+class PersonInfo(TypedDict):
+    """Shape of the person_info schema below; a plain dict at runtime"""
+    name: str
+    age: int
+    occupation: str
 
-def get_structured_output_strict_json():
+
+def get_structured_output_strict_json() -> PersonInfo:
     """
     Use OpenAI's structured output with strict JSON schema.
     This ensures the model returns data in the exact format specified.
@@ -48,7 +51,8 @@ def get_structured_output_strict_json():
     }
     
     # Make the API call with structured output
-    completion = client.chat.completions.create(
+    completion = cached_complete(
+        get_client(),
         model="gpt-4o-2024-08-06",  # Note: structured outputs require specific models
         messages=[
             {
@@ -69,7 +73,9 @@ def get_structured_output_strict_json():
     print(result)
     print("\n" + "="*50 + "\n")
     
-    return result
+    # Strict mode already guarantees the shape, so no model validation is needed
+    person: PersonInfo = orjson.loads(result)
+    return person
 
 if __name__ == "__main__":
     print("OpenAI Structured Output - Strict JSON Mode Examples\n")
@@ -3,22 +3,18 @@ OpenAI Structured Output Example 2: Using Pydantic AI
 This example uses Pydantic models for schema validation with OpenAI.
 """
 
-import os
-import json
-from dotenv import load_dotenv
-from openai import OpenAI
-from pydantic import BaseModel, Field, field_validator
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import functools
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from _client import get_client
+from _cache import cached_complete
 
 
 # Define Pydantic models for schema validation
 class PersonProfile(BaseModel):
     """Simple person profile with Pydantic validation"""
+    # Profiles are created once from a response and never modified
+    model_config = ConfigDict(frozen=True)
+    
     name: str = Field(description="The person's full name")
     age: int = Field(ge=0, le=150, description="Age must be between 0 and 150")
     occupation: str = Field(description="The person's job or profession")
@@ -32,17 +28,11 @@ class PersonProfile(BaseModel):
         return v.strip()
 
 
-def get_structured_output_with_pydantic(model_class: type[BaseModel], prompt: str, system_message: str):
+@functools.lru_cache(maxsize=None)
+def _response_format(model_class: type[BaseModel]) -> dict:
     """
-    Generic function to get structured output using Pydantic models.
-    
-    Args:
-        model_class: Pydantic model class defining the schema
-        prompt: User prompt
-        system_message: System message for the AI
-    
-    Returns:
-        Validated Pydantic model instance
+    Build the strict JSON schema response format for a Pydantic model.
+    Cached per model class so the schema is only generated once.
     """
     # Convert Pydantic model to JSON schema
     schema = model_class.model_json_schema()
@@ -50,7 +40,7 @@ def get_structured_output_with_pydantic(model_class: type[BaseModel], prompt: st
     # Add additionalProperties: false for strict mode
     schema["additionalProperties"] = False
     
-    response_format = {
+    return {
         "type": "json_schema",
         "json_schema": {
             "name": model_class.__name__,
@@ -58,22 +48,35 @@ def get_structured_output_with_pydantic(model_class: type[BaseModel], prompt: st
             "schema": schema
         }
     }
+
+
+def get_structured_output_with_pydantic(model_class: type[BaseModel], prompt: str, system_message: str):
+    """
+    Generic function to get structured output using Pydantic models.
     
+    Args:
+        model_class: Pydantic model class defining the schema
+        prompt: User prompt
+        system_message: System message for the AI
+    
+    Returns:
+        Validated Pydantic model instance
+    """
     # Make API call
-    completion = client.chat.completions.create(
+    completion = cached_complete(
+        get_client(),
         model="gpt-4o-2024-08-06",
         messages=[
             {"role": "system", "content": system_message},
             {"role": "user", "content": prompt}
         ],
-        response_format=response_format
+        response_format=_response_format(model_class)
     )
     
-    # Parse and validate the response using Pydantic
-    json_response = json.loads(completion.choices[0].message.content)
-    validated_result = model_class.model_validate(json_response)
-    
-    return validated_result
+    # Strict mode guarantees the shape server-side, but Pydantic still runs
+    # checks it cannot (e.g. name_must_not_be_empty); parse and validate
+    # the response in a single pass
+    return model_class.model_validate_json(completion.choices[0].message.content)
 
 
 def example_person_profile():
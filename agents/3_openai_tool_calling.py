@@ -4,16 +4,64 @@ This example demonstrates how to use OpenAI's function calling feature
 with multiple tools and show how the LLM routes requests to appropriate tools.
 """
 
+import io
 import os
-import json
-from dotenv import load_dotenv
-from openai import OpenAI
+import sys
+import ast
+import asyncio
+import operator
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import TextIO
+import orjson
+import fastjsonschema
+from aiolimiter import AsyncLimiter
+from openai.types.chat import ChatCompletion
+from _client import get_async_client
+from _cache import acached_complete
 
-# Load environment variables from .env file
-load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# ============================================================================
+# SIMULATED DATA
+# ============================================================================
+
+# Weather data keyed by lower-cased city name
+_WEATHER_TABLE = {
+    "london": {"temp": 15, "condition": "Cloudy", "humidity": 65},
+    "new york": {"temp": 22, "condition": "Sunny", "humidity": 45},
+    "tokyo": {"temp": 18, "condition": "Rainy", "humidity": 80},
+    "paris": {"temp": 17, "condition": "Partly Cloudy", "humidity": 55},
+    "sydney": {"temp": 25, "condition": "Sunny", "humidity": 50},
+}
+_DEFAULT_WEATHER = {"temp": 20, "condition": "Unknown", "humidity": 50}
+
+# Stock data keyed by upper-cased ticker symbol
+_STOCK_TABLE = {
+    "AAPL": {"price": 178.50, "change": +2.30, "change_percent": 1.31},
+    "GOOGL": {"price": 142.80, "change": -1.20, "change_percent": -0.83},
+    "MSFT": {"price": 415.30, "change": +5.40, "change_percent": 1.32},
+    "TSLA": {"price": 242.80, "change": +8.60, "change_percent": 3.67},
+    "AMZN": {"price": 178.25, "change": -0.50, "change_percent": -0.28},
+}
+_DEFAULT_STOCK = {"price": 0, "change": 0, "change_percent": 0}
+
+# Database tables keyed by table name
+_DATABASE_TABLES = {
+    "users": [
+        {"id": 1, "name": "Alice Johnson", "email": "alice@example.com"},
+        {"id": 2, "name": "Bob Smith", "email": "bob@example.com"},
+        {"id": 3, "name": "Charlie Brown", "email": "charlie@example.com"},
+    ],
+    "products": [
+        {"id": 101, "name": "Laptop", "price": 999},
+        {"id": 102, "name": "Mouse", "price": 29},
+        {"id": 103, "name": "Keyboard", "price": 79},
+    ],
+    "orders": [
+        {"id": 501, "customer": "Alice", "total": 1107},
+        {"id": 502, "customer": "Bob", "total": 79},
+    ]
+}
 
 
 # ============================================================================
@@ -25,17 +73,7 @@ def get_weather(location: str, unit: str = "celsius") -> dict:
     Get the current weather for a location.
     In a real application, this would call a weather API.
     """
-    # Simulated weather data
-    weather_data = {
-        "london": {"temp": 15, "condition": "Cloudy", "humidity": 65},
-        "new york": {"temp": 22, "condition": "Sunny", "humidity": 45},
-        "tokyo": {"temp": 18, "condition": "Rainy", "humidity": 80},
-        "paris": {"temp": 17, "condition": "Partly Cloudy", "humidity": 55},
-        "sydney": {"temp": 25, "condition": "Sunny", "humidity": 50},
-    }
-    
-    location_lower = location.lower()
-    data = weather_data.get(location_lower, {"temp": 20, "condition": "Unknown", "humidity": 50})
+    data = _WEATHER_TABLE.get(location.lower(), _DEFAULT_WEATHER)
     
     return {
         "location": location,
@@ -46,6 +84,43 @@ def get_weather(location: str, unit: str = "celsius") -> dict:
     }
 
 
+# Characters allowed in calculator expressions; translating an expression
+# with _BAD_TABLE deletes them, so anything left over is invalid
+_ALLOWED_CHARS = "0123456789+-*/(). "
+_BAD_TABLE = str.maketrans("", "", _ALLOWED_CHARS)
+
+# Arithmetic operators the calculator is allowed to evaluate
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+}
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+@lru_cache(maxsize=1024)
+def _compile(expression: str) -> ast.Expression:
+    """Parse an expression once; repeated expressions reuse the cached tree."""
+    # Strip like eval() does; ast.parse rejects leading whitespace as an indent
+    return ast.parse(expression.strip(), mode="eval")
+
+
+def _eval(node: ast.AST) -> int | float:
+    """Evaluate a parsed arithmetic expression, rejecting anything else."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        return _BINARY_OPERATORS[type(node.op)](_eval(node.left), _eval(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_eval(node.operand))
+    raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+
 def calculate(expression: str) -> dict:
     """
     Perform a mathematical calculation.
@@ -53,11 +128,10 @@ def calculate(expression: str) -> dict:
     """
     try:
         # Only allow safe mathematical operations
-        allowed_chars = set("0123456789+-*/(). ")
-        if not all(c in allowed_chars for c in expression):
+        if expression.translate(_BAD_TABLE):
             return {"error": "Invalid characters in expression"}
         
-        result = eval(expression)
+        result = _eval(_compile(expression).body)
         return {
             "expression": expression,
             "result": result
@@ -71,17 +145,8 @@ def get_stock_price(symbol: str) -> dict:
     Get the current stock price for a symbol.
     In a real application, this would call a financial API.
     """
-    # Simulated stock data
-    stock_data = {
-        "AAPL": {"price": 178.50, "change": +2.30, "change_percent": 1.31},
-        "GOOGL": {"price": 142.80, "change": -1.20, "change_percent": -0.83},
-        "MSFT": {"price": 415.30, "change": +5.40, "change_percent": 1.32},
-        "TSLA": {"price": 242.80, "change": +8.60, "change_percent": 3.67},
-        "AMZN": {"price": 178.25, "change": -0.50, "change_percent": -0.28},
-    }
-    
     symbol_upper = symbol.upper()
-    data = stock_data.get(symbol_upper, {"price": 0, "change": 0, "change_percent": 0})
+    data = _STOCK_TABLE.get(symbol_upper, _DEFAULT_STOCK)
     
     return {
         "symbol": symbol_upper,
@@ -96,12 +161,14 @@ def send_email(to: str, subject: str, body: str) -> dict:
     Send an email (simulated).
     In a real application, this would use an email service.
     """
+    preview = body if len(body) <= 50 else body[:50] + "..."
+    
     return {
         "status": "success",
         "message": f"Email sent to {to}",
         "to": to,
         "subject": subject,
-        "body_preview": body[:50] + "..." if len(body) > 50 else body
+        "body_preview": preview
     }
 
 
@@ -110,25 +177,8 @@ def search_database(query: str, table: str = "users") -> dict:
     Search a database (simulated).
     In a real application, this would query a real database.
     """
-    # Simulated database results
-    results = {
-        "users": [
-            {"id": 1, "name": "Alice Johnson", "email": "alice@example.com"},
-            {"id": 2, "name": "Bob Smith", "email": "bob@example.com"},
-            {"id": 3, "name": "Charlie Brown", "email": "charlie@example.com"},
-        ],
-        "products": [
-            {"id": 101, "name": "Laptop", "price": 999},
-            {"id": 102, "name": "Mouse", "price": 29},
-            {"id": 103, "name": "Keyboard", "price": 79},
-        ],
-        "orders": [
-            {"id": 501, "customer": "Alice", "total": 1107},
-            {"id": 502, "customer": "Bob", "total": 79},
-        ]
-    }
-    
-    table_data = results.get(table, [])
+    # Copy the rows so callers can't modify the shared module-level table
+    table_data = [dict(row) for row in _DATABASE_TABLES.get(table, [])]
     
     return {
         "table": table,
@@ -142,7 +192,9 @@ def search_database(query: str, table: str = "users") -> dict:
 # TOOL DEFINITIONS FOR OPENAI
 # ============================================================================
 
-tools = [
+# Built once at import and reused by every request; a tuple so that no
+# caller can append to or reorder the shared schema between calls
+tools = (
     {
         "type": "function",
         "function": {
@@ -251,7 +303,7 @@ tools = [
             }
         }
     }
-]
+)
 
 
 # Map function names to actual functions
@@ -263,33 +315,185 @@ available_functions = {
     "search_database": search_database,
 }
 
+# Argument validators compiled once from the tool schemas; strict mode should
+# already guarantee valid arguments, this catches anything that slips through
+_VALIDATORS = {
+    tool["function"]["name"]: fastjsonschema.compile(tool["function"]["parameters"])
+    for tool in tools
+}
+
+
+def describe_weather(result: dict) -> str | None:
+    """Phrase a get_weather result as an answer; None for unknown locations."""
+    if result["condition"] == "Unknown":
+        return None
+    unit = "°C" if result["unit"] == "celsius" else "°F"
+    return (
+        f"The weather in {result['location']} is {result['condition'].lower()}, "
+        f"{result['temperature']}{unit} with {result['humidity']}% humidity."
+    )
+
+
+def describe_calculation(result: dict) -> str | None:
+    """Phrase a calculate result as an answer."""
+    return f"{result['expression']} = {result['result']}."
+
+
+def describe_stock_price(result: dict) -> str | None:
+    """Phrase a get_stock_price result as an answer; None for unknown symbols."""
+    if not result["price"]:
+        return None
+    return (
+        f"{result['symbol']} is trading at ${result['price']:.2f} "
+        f"({result['change']:+.2f}, {result['change_percent']:+.2f}%)."
+    )
+
+
+# Tools whose result fully answers the question that triggered them,
+# mapped to a function that phrases the result as the final answer
+self_describing_tools = {
+    "get_weather": describe_weather,
+    "calculate": describe_calculation,
+    "get_stock_price": describe_stock_price,
+}
+
+
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+
+# Cap in-flight requests and requests per minute so large fan-outs stay
+# under the account's rate limits instead of failing with 429s.
+# Tune both numbers to your OpenAI usage tier.
+_SEM = asyncio.Semaphore(32)
+_LIMITER = AsyncLimiter(500, 60)
+
+
+@asynccontextmanager
+async def rate_limited():
+    """Hold a concurrency slot and a rate-limit token for one API request."""
+    async with _SEM, _LIMITER:
+        yield
+
 
 # ============================================================================
 # MAIN CONVERSATION HANDLER
 # ============================================================================
 
-def run_conversation(user_query: str, verbose: bool = True):
+async def run_tool(tool_call, verbose: bool = True, out: TextIO | None = None) -> dict:
     """
-    Run a conversation with tool calling.
-    Shows how the LLM routes requests to appropriate tools.
+    Execute a single tool call and return the tool's result.
+    The tools are blocking functions, so they run in a worker thread
+    to let several tool calls from the same turn proceed in parallel.
+    Verbose output goes to `out` (stdout by default).
     """
+    if out is None:
+        out = sys.stdout
+    
+    # Interned so the lookups below hit the identity fast path against the
+    # (already interned) string-literal tool names used as keys
+    function_name = sys.intern(tool_call.function.name)
+    
+    if verbose:
+        print(f"   → Calling: {function_name}", file=out)
+        print(f"     Arguments: {tool_call.function.arguments}", file=out)
+    
+    # Check the tool name and arguments before calling anything; a
+    # hallucinated tool or bad arguments are reported back to the model
+    # as the tool result instead of raising and cancelling other queries
+    error = None
+    if function_name not in available_functions:
+        error = f"Unknown tool: {function_name}"
+    else:
+        try:
+            function_args = orjson.loads(tool_call.function.arguments)
+            _VALIDATORS[function_name](function_args)
+        except orjson.JSONDecodeError as e:
+            error = f"Arguments are not valid JSON: {e}"
+        except fastjsonschema.JsonSchemaValueException as e:
+            error = f"Invalid arguments: {e.message}"
+    
+    # Call the actual function
+    if error is not None:
+        function_response = {"error": error}
+    else:
+        function_to_call = available_functions[function_name]
+        function_response = await asyncio.to_thread(function_to_call, **function_args)
+    
     if verbose:
-        print(f"\n{'='*70}")
-        print(f"USER QUERY: {user_query}")
-        print(f"{'='*70}\n")
+        print(f"     Result: {orjson.dumps(function_response, option=orjson.OPT_INDENT_2).decode()}\n", file=out)
     
-    messages = [
+    return function_response
+
+
+def build_messages(user_query: str) -> list:
+    """
+    Build the opening messages of a conversation for a user query.
+    """
+    return [
         {"role": "system", "content": "You are a helpful assistant with access to various tools. Use them to answer user queries accurately."},
         {"role": "user", "content": user_query}
     ]
+
+
+def answer_locally(tool_calls, results) -> str | None:
+    """
+    Build the final answer from a tool result without a second LLM call.
+    Only done for a single, successful call to a self-describing tool:
+    a turn with several tool calls may compare or combine their results
+    (e.g. "Is it warmer in Tokyo or Sydney?"), which needs the model.
+    Returns None when the model is needed to synthesize an answer.
+    """
+    if len(tool_calls) != 1:
+        return None
     
-    # First API call - LLM decides which tool(s) to use
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        tools=tools,
-        tool_choice="auto"  # Let the model decide when to use tools
-    )
+    tool_call, result = tool_calls[0], results[0]
+    describe = self_describing_tools.get(tool_call.function.name)
+    if describe is None or "error" in result:
+        return None
+    
+    return describe(result)
+
+
+def print_final_answer_header(out: TextIO):
+    """Print the banner that introduces a conversation's final answer."""
+    print("="*70, file=out)
+    print("FINAL ANSWER:", file=out)
+    print("="*70, file=out)
+
+
+async def run_conversation(user_query: str, verbose: bool = True, response: ChatCompletion | None = None,
+                           out: TextIO | None = None):
+    """
+    Run a conversation with tool calling.
+    Shows how the LLM routes requests to appropriate tools.
+    If `response` is given (e.g. from a batch job), it is used as the
+    first-turn completion instead of making a live API call.
+    Verbose output goes to `out` (stdout by default); pass a buffer when
+    several conversations run at once so their transcripts stay separate.
+    """
+    if out is None:
+        out = sys.stdout
+    
+    if verbose:
+        print(f"\n{'='*70}", file=out)
+        print(f"USER QUERY: {user_query}", file=out)
+        print(f"{'='*70}\n", file=out)
+    
+    messages = build_messages(user_query)
+    
+    # First API call - LLM decides which tool(s) to use.
+    # Cache hits return without taking a rate-limit slot.
+    if response is None:
+        response = await acached_complete(
+            get_async_client(),
+            limit=rate_limited,
+            model="gpt-4o",
+            messages=messages,
+            tools=tools,
+            tool_choice="auto",  # Let the model decide when to use tools
+            parallel_tool_calls=True  # Request every needed tool in one turn
+        )
     
     response_message = response.choices[0].message
     tool_calls = response_message.tool_calls
@@ -297,91 +501,244 @@ def run_conversation(user_query: str, verbose: bool = True):
     # If the model wants to call tools
     if tool_calls:
         if verbose:
-            print(f"🤖 LLM wants to call {len(tool_calls)} tool(s):\n")
+            print(f"🤖 LLM wants to call {len(tool_calls)} tool(s):\n", file=out)
         
-        # Add the assistant's response to messages
-        messages.append(response_message)
+        # Execute all tool calls concurrently; gather keeps results in call order.
+        # Each call logs to its own buffer so its lines stay together.
+        tool_logs = [io.StringIO() for _ in tool_calls]
+        results = await asyncio.gather(
+            *[run_tool(tool_call, verbose, log) for tool_call, log in zip(tool_calls, tool_logs)]
+        )
+        for log in tool_logs:
+            out.write(log.getvalue())
         
-        # Execute each tool call
-        for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            function_args = json.loads(tool_call.function.arguments)
-            
+        # A single self-describing tool result answers the query on its own,
+        # which saves the second round-trip to the model
+        final_answer = answer_locally(tool_calls, results)
+        
+        if final_answer is not None:
             if verbose:
-                print(f"   → Calling: {function_name}")
-                print(f"     Arguments: {json.dumps(function_args, indent=6)}")
+                print("🤖 Tool results answer the query directly, skipping the second LLM call.\n", file=out)
+                print_final_answer_header(out)
+                print(final_answer, file=out)
+        else:
+            # Add the assistant's response to messages
+            messages.append(response_message)
             
-            # Call the actual function
-            function_to_call = available_functions[function_name]
-            function_response = function_to_call(**function_args)
+            # Add the function responses to messages in the order they were requested
+            for tool_call, function_response in zip(tool_calls, results):
+                messages.append({
+                    "tool_call_id": tool_call.id,
+                    "role": "tool",
+                    "name": tool_call.function.name,
+                    "content": orjson.dumps(function_response).decode(),
+                })
             
+            # Second API call - stream the final response from the model
             if verbose:
-                print(f"     Result: {json.dumps(function_response, indent=6)}\n")
+                print("🤖 Streaming final response from LLM...\n", file=out)
+                print_final_answer_header(out)
             
-            # Add the function response to messages
-            messages.append({
-                "tool_call_id": tool_call.id,
-                "role": "tool",
-                "name": function_name,
-                "content": json.dumps(function_response),
-            })
-        
-        # Second API call - get the final response from the model
-        if verbose:
-            print("🤖 Getting final response from LLM...\n")
-        
-        second_response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-        )
-        
-        final_answer = second_response.choices[0].message.content
+            # Print tokens as they arrive and keep them for the return value;
+            # the request holds its slot until the stream is fully consumed
+            parts = []
+            async with rate_limited():
+                stream = await get_async_client().chat.completions.create(
+                    model="gpt-4o",
+                    messages=messages,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        if verbose:
+                            # Live on stdout for a single conversation;
+                            # into the transcript buffer when run from main
+                            out.write(delta)
+                            out.flush()
+            
+            final_answer = "".join(parts)
+            if verbose:
+                print(file=out)
     else:
         # No tool calls needed
         final_answer = response_message.content
         if verbose:
-            print("🤖 No tools needed for this query.\n")
+            print("🤖 No tools needed for this query.\n", file=out)
+            print_final_answer_header(out)
+            print(final_answer, file=out)
     
     if verbose:
-        print(f"{'='*70}")
-        print(f"FINAL ANSWER:")
-        print(f"{'='*70}")
-        print(final_answer)
-        print(f"{'='*70}\n")
+        print(f"{'='*70}\n", file=out)
     
     return final_answer
 
 
 # ============================================================================
-# EXAMPLE QUERIES
+# BATCH MODE
 # ============================================================================
 
-if __name__ == "__main__":
-    print("\n" + "="*70)
-    print("OpenAI Tool Calling Examples - 5 Different Tools")
-    print("="*70)
+async def run_batch(queries: list[str], poll_interval: float = 30.0) -> list[ChatCompletion | None]:
+    """
+    Submit the first turn of every query as a single OpenAI Batch job.
+    Batch requests cost half as much as live ones but may take up to 24h,
+    so this is meant for offline demo/CI runs. Returns one completion per
+    query, or None for requests that failed inside the batch.
+    """
+    client = get_async_client()
+    
+    # One /v1/chat/completions request per line of the JSONL input file
+    lines = [
+        orjson.dumps({
+            "custom_id": f"query-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": "gpt-4o",
+                "messages": build_messages(query),
+                "tools": tools,
+                "tool_choice": "auto",
+                "parallel_tool_calls": True,
+            },
+        })
+        for i, query in enumerate(queries)
+    ]
+    batch_input = await client.files.create(
+        file=("tool_calling_batch.jsonl", b"\n".join(lines)),
+        purpose="batch",
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_input.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"Submitted batch {batch.id} with {len(queries)} requests")
     
+    # Poll until the batch reaches a terminal state
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(poll_interval)
+        batch = await client.batches.retrieve(batch.id)
+    
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} finished with status '{batch.status}'")
+    
+    # Output lines are not guaranteed to be in input order; match on custom_id
+    responses = {}
+    if batch.output_file_id:
+        output = await client.files.content(batch.output_file_id)
+        for line in output.content.splitlines():
+            record = orjson.loads(line)
+            responses[record["custom_id"]] = ChatCompletion.model_validate(record["response"]["body"])
+    
+    return [responses.get(f"query-{i}") for i in range(len(queries))]
+
+
+# ============================================================================
+# EXAMPLE QUERIES
+# ============================================================================
+
+QUERIES = [
     # Example 1: Weather query (routes to get_weather)
-    run_conversation("What's the weather like in Tokyo?")
+    "What's the weather like in Tokyo?",
     
     # Example 2: Math calculation (routes to calculate)
-    run_conversation("What is 157 multiplied by 23?")
+    "What is 157 multiplied by 23?",
     
     # Example 3: Stock price query (routes to get_stock_price)
-    run_conversation("What's the current stock price of Apple?")
+    "What's the current stock price of Apple?",
     
     # Example 4: Database search (routes to search_database)
-    run_conversation("Show me all users in the database")
+    "Show me all users in the database",
     
     # Example 5: Email sending (routes to send_email)
-    run_conversation("Send an email to john@example.com with subject 'Meeting Tomorrow' and tell him the meeting is at 2 PM")
+    "Send an email to john@example.com with subject 'Meeting Tomorrow' and tell him the meeting is at 2 PM",
     
     # Example 6: Multiple tools in one query (routes to multiple tools)
-    print("\n" + "="*70)
-    print("BONUS: Query requiring MULTIPLE tools")
-    print("="*70)
-    run_conversation("What's the weather in Paris and what's the stock price of Microsoft?")
+    "What's the weather in Paris and what's the stock price of Microsoft?",
     
     # Example 7: Complex query with calculation
-    run_conversation("Calculate 15% of 250 and tell me the weather in London")
+    "Calculate 15% of 250 and tell me the weather in London",
+]
+
+# Position of the BONUS example that needs multiple tools (Example 6)
+MULTI_TOOL_EXAMPLE = 5
+
+
+class OrderedTranscript:
+    """
+    Output for one of several concurrent conversations.
+    Text is buffered until the conversation reaches the head of the print
+    order; then the buffer is flushed and later writes (including streamed
+    tokens) go straight to stdout.
+    """
+    
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._live = False
+    
+    def write(self, text: str) -> int:
+        if self._live:
+            return sys.stdout.write(text)
+        return self._buffer.write(text)
+    
+    def flush(self):
+        if self._live:
+            sys.stdout.flush()
+    
+    def go_live(self):
+        """Print everything buffered so far and switch to writing to stdout."""
+        sys.stdout.write(self._buffer.getvalue())
+        sys.stdout.flush()
+        self._buffer = io.StringIO()
+        self._live = True
+
 
+async def main():
+    """
+    Run all example queries concurrently in a task group.
+    The queries are independent, so their API round-trips overlap;
+    a failing query cancels the rest instead of leaving them running.
+    Transcripts are printed in query order: the conversation at the head
+    of the order writes (and streams) straight to stdout, later ones are
+    buffered until every conversation before them has finished.
+    With OFFLINE=1 the first turns go through the Batch API instead;
+    follow-up turns (and any failed batch requests) still run live.
+    """
+    try:
+        if os.getenv("OFFLINE") == "1":
+            responses = await run_batch(QUERIES)
+        else:
+            responses = [None] * len(QUERIES)
+        
+        transcripts = [OrderedTranscript() for _ in QUERIES]
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(run_conversation(query, response=response, out=transcript))
+                for query, response, transcript in zip(QUERIES, responses, transcripts)
+            ]
+            
+            # Hand stdout to each conversation in turn, as soon as the previous
+            # one has finished
+            for i, (task, transcript) in enumerate(zip(tasks, transcripts)):
+                if i == MULTI_TOOL_EXAMPLE:
+                    print("\n" + "="*70)
+                    print("BONUS: Query requiring MULTIPLE tools")
+                    print("="*70)
+                transcript.go_live()
+                await task
+    finally:
+        # Close the connection pool while the event loop is still running
+        await get_async_client().close()
+        get_async_client.cache_clear()
+    
+    return [task.result() for task in tasks]
+
+if __name__ == "__main__":
+    print("\n" + "="*70)
+    print("OpenAI Tool Calling Examples - 5 Different Tools")
+    print("="*70)
+    
+    asyncio.run(main())
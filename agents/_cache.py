@@ -0,0 +1,176 @@
+"""
+Response cache for chat completions.
+Requests are looked up by an exact hash. Call sites can opt in to
+near-matching with semantic=True: the user prompt's embedding is then
+compared by cosine similarity against earlier prompts sent with the same
+model, tools and response format.
+
+A near-match returns the answer to a *different* prompt. Prompts that
+differ only in a name or number ("...named Bob" vs "...named Rob") embed
+almost identically, so only opt in where any close paraphrase deserves
+the same answer. Requests with tools never near-match, since replaying
+their tool calls would use the wrong arguments.
+Entries persist in SQLite so repeated demo and CI runs can skip the API.
+"""
+
+import os
+import sqlite3
+import contextlib
+import hashlib
+import numpy as np
+import orjson
+from pydantic import BaseModel
+from openai.types.chat import ChatCompletion
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+SIMILARITY_THRESHOLD = 0.95
+
+# Kept next to the scripts rather than in whatever directory they run from
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".response_cache.sqlite3")
+
+
+def _default(obj):
+    """Serialize SDK message objects that end up in a conversation history."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(exclude_none=True)
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def _digest(value) -> bytes:
+    return hashlib.blake2b(orjson.dumps(value, default=_default, option=orjson.OPT_SORT_KEYS)).digest()
+
+
+def _describe(request: dict) -> tuple[bytes, bytes, str]:
+    """
+    Split a request into its exact-match key, the scope it may be
+    near-matched within, and the user text to embed.
+    """
+    user_text = []
+    other_messages = []
+    for message in request["messages"]:
+        if isinstance(message, dict) and message.get("role") == "user":
+            user_text.append(message["content"])
+        else:
+            other_messages.append(message)
+
+    scope = {**request, "messages": other_messages}
+    return _digest(request), _digest(scope), "\n".join(user_text)
+
+
+class ResponseCache:
+    """
+    In-memory cache of completions backed by a SQLite file.
+    Embeddings are stored L2-normalized, one matrix per scope, so a
+    near-match lookup is a single matrix-vector product.
+    """
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key BLOB PRIMARY KEY, scope BLOB, embedding BLOB, response TEXT)"
+        )
+        self._exact = {}
+        self._scopes = {}
+        for key, scope, embedding, response in self._db.execute("SELECT * FROM responses"):
+            if embedding is not None:
+                embedding = np.frombuffer(embedding, dtype=np.float32)
+            self._remember(key, scope, embedding, response)
+
+    def _remember(self, key: bytes, scope: bytes, embedding: np.ndarray | None, response: str):
+        self._exact[key] = response
+        if embedding is None:
+            return
+        matrix, responses = self._scopes.get(scope, (np.empty((0, embedding.size), dtype=np.float32), []))
+        self._scopes[scope] = (np.vstack([matrix, embedding]), responses + [response])
+
+    def get(self, key: bytes) -> ChatCompletion | None:
+        response = self._exact.get(key)
+        return None if response is None else ChatCompletion.model_validate_json(response)
+
+    def get_similar(self, scope: bytes, embedding: np.ndarray) -> ChatCompletion | None:
+        if scope not in self._scopes:
+            return None
+        matrix, responses = self._scopes[scope]
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < SIMILARITY_THRESHOLD:
+            return None
+        return ChatCompletion.model_validate_json(responses[best])
+
+    def put(self, key: bytes, scope: bytes, embedding: np.ndarray | None, completion: ChatCompletion):
+        response = completion.model_dump_json()
+        self._remember(key, scope, embedding, response)
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+            (key, scope, None if embedding is None else embedding.tobytes(), response),
+        )
+        self._db.commit()
+
+
+def _normalize(embedding_response) -> np.ndarray:
+    embedding = np.asarray(embedding_response.data[0].embedding, dtype=np.float32)
+    return embedding / np.linalg.norm(embedding)
+
+
+_cache = None
+
+
+def _get_cache() -> ResponseCache:
+    """Open (or create) the cache file on first use rather than at import."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(os.getenv("RESPONSE_CACHE", DEFAULT_CACHE_PATH))
+    return _cache
+
+
+def cached_complete(client, *, semantic: bool = False, **request) -> ChatCompletion:
+    """
+    Drop-in for client.chat.completions.create(**request) on a sync client.
+    Only use it for non-streaming requests. With semantic=True a close
+    enough earlier prompt counts as a hit (see module docstring).
+    """
+    cache = _get_cache()
+    key, scope, user_text = _describe(request)
+    if (completion := cache.get(key)) is not None:
+        return completion
+
+    # Near-matching is opt-in, and never used for tool calls (see module docstring)
+    embedding = None
+    if semantic and user_text and not request.get("tools"):
+        embedding = _normalize(client.embeddings.create(model=EMBEDDING_MODEL, input=user_text))
+        if (completion := cache.get_similar(scope, embedding)) is not None:
+            return completion
+
+    completion = client.chat.completions.create(**request)
+    cache.put(key, scope, embedding, completion)
+    return completion
+
+
+async def acached_complete(
+    client, *, semantic: bool = False, limit=contextlib.nullcontext, **request
+) -> ChatCompletion:
+    """
+    Drop-in for client.chat.completions.create(**request) on an async client.
+    Only use it for non-streaming requests. With semantic=True a close
+    enough earlier prompt counts as a hit (see module docstring).
+    limit() is entered around each API call only, so a rate limiter passed
+    here is never held for a cache hit.
+    """
+    cache = _get_cache()
+    key, scope, user_text = _describe(request)
+    if (completion := cache.get(key)) is not None:
+        return completion
+
+    # Near-matching is opt-in, and never used for tool calls (see module docstring)
+    embedding = None
+    if semantic and user_text and not request.get("tools"):
+        async with limit():
+            embedding = _normalize(await client.embeddings.create(model=EMBEDDING_MODEL, input=user_text))
+        if (completion := cache.get_similar(scope, embedding)) is not None:
+            return completion
+
+    async with limit():
+        completion = await client.chat.completions.create(**request)
+    cache.put(key, scope, embedding, completion)
+    return completion
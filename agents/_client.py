@@ -0,0 +1,37 @@
+"""
+Shared OpenAI clients for the agent examples.
+Every script gets its client from here so that connection pooling,
+HTTP/2 and timeouts are configured in one place. Clients are built on
+first use, so importing this module opens no connection pools.
+"""
+
+import os
+import httpx
+from functools import lru_cache
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Pool sized for large asyncio fan-outs; HTTP/2 multiplexes concurrent
+# requests over a few kept-alive connections instead of one per request
+_limits = httpx.Limits(max_connections=256, max_keepalive_connections=64, keepalive_expiry=30)
+_timeout = httpx.Timeout(60.0, connect=5.0)
+
+@lru_cache(maxsize=None)
+def get_client() -> OpenAI:
+    """Client for the synchronous examples."""
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=httpx.Client(http2=True, limits=_limits, timeout=_timeout),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_async_client() -> AsyncOpenAI:
+    """Client for the asyncio examples."""
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=httpx.AsyncClient(http2=True, limits=_limits, timeout=_timeout),
+    )
@@ -1,26 +1,20 @@
-import subprocess
+import os
 import sys
 
 def main():
     print("Setting up IPython kernel for embedding-work...")
-    
+    # Flush before exec replaces this process, or the message is lost
+    sys.stdout.flush()
+
     try:
-        # Install the kernel with the name "embedding-work"
-        result = subprocess.run(
-            [sys.executable, "-m", "ipykernel", "install", "--user", "--name=embedding-work", "--display-name=embedding-work"],
-            capture_output=True,
-            text=True
+        # Install the kernel with the name "embedding-work"; ipykernel takes
+        # over this process and reports the installed kernelspec itself
+        os.execvp(
+            sys.executable,
+            [sys.executable, "-m", "ipykernel", "install", "--user", "--name=embedding-work", "--display-name=embedding-work"]
         )
-        
-        if result.returncode == 0:
-            print("✓ Successfully installed IPython kernel 'embedding-work'")
-            print(result.stdout)
-        else:
-            print("✗ Error installing kernel:")
-            print(result.stderr)
-            sys.exit(1)
-            
-    except Exception as e:
+
+    except OSError as e:
         print(f"✗ Error: {e}")
         sys.exit(1)
 